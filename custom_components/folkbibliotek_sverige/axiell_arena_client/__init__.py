@@ -3,18 +3,61 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import hashlib
 import logging
+import re
+import time
 from typing import TYPE_CHECKING, Self
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
 
 if TYPE_CHECKING:
     import aiohttp
+    from bs4 import Tag
 
 _LOGGER = logging.getLogger(__name__)
 
 LOGIN_ATTEMPTS = 3
 
+# Seconds an account overview is reused by clients with the same credentials,
+# this saves fetching it again when an entry is set up right after the config
+# flow validated it
+OVERVIEW_CACHE_TTL = 30
+
+_OVERVIEW_CACHE: dict[tuple[str, str, str], tuple[float, str]] = {}
+
+_LOGIN_STRAINER = SoupStrainer("div", id="portlet_patronLogin_WAR_arenaportlet")
+
+_FEEDBACK_RE = re.compile(
+    r"^(?:(?P<account_locked>Ditt konto har stängts)"
+    r"|(?P<invalid_credentials>Du blev inte inloggad))"
+)
+
+_SEL_LOANS_TABLE = sv.compile("table#loansTable")
+_SEL_RESERVATIONS = sv.compile("div.portlet-myReservations")
+_SEL_RESERVATION_RECORD = sv.compile("div.arena-library-record")
+_SEL_RECORD_ID = sv.compile("span.arena-record-id")
+_SEL_TITLE = sv.compile("div.arena-record-title span")
+_SEL_RENEWAL_DATE = sv.compile("span.arena-renewal-date-value")
+_SEL_PICKUP = sv.compile("td.arena-record-pickup")
+
+_SEL_MEDIA_VALUE = sv.compile("div.arena-record-media span.arena-value")
+_SEL_AUTHOR_VALUE = sv.compile("div.arena-record-author span.arena-value")
+_SEL_YEAR_VALUE = sv.compile("div.arena-record-year span.arena-value")
+_SEL_RENEWAL_BRANCH_VALUE = sv.compile("div.arena-renewal-branch span.arena-value")
+_SEL_RESERVATION_FROM_VALUE = sv.compile(
+    "td.arena-reservation-from-container span.arena-value"
+)
+_SEL_RESERVATION_TO_VALUE = sv.compile(
+    "td.arena-reservation-to-container span.arena-value"
+)
+_SEL_QUEUE_VALUE = sv.compile("td.arena-record-queue span.arena-value")
+_SEL_BRANCH_VALUE = sv.compile("td.arena-record-branch span.arena-value")
+_SEL_EXPIRE_VALUE = sv.compile("td.arena-record-expire span.arena-value")
+_SEL_PICKUP_VALUE = sv.compile("td.arena-record-pickup span.arena-value")
+
 
 class ArenaError(Exception):
     """Base class for exceptions in this module."""
@@ -48,20 +91,55 @@ class ArenaInvalidCredentialsError(ArenaLoginError):
     msg = "Invalid credentials"
 
 
+class ArenaInvalidUrlError(ArenaError):
+    """Exception raised when the URL has no host name."""
+
+    msg = "Invalid URL"
+
+    def __init__(self) -> None:
+        """Initialize the exception."""
+        super().__init__(self.msg)
+
+
 class ArenaNotLoggedInError(ArenaError):
     """Exception raised when not logged in."""
 
     msg = "Not logged in"
 
 
-def _get_value(tag: Tag, selector: str) -> str | None:
-    selected = tag.select_one(f"{selector}  span.arena-value")
+# Canonical copies of field values which repeat across rows and refreshes, such
+# as media type, author, year and library name. Per record values such as dates
+# are not interned, the table would fill up with stale values.
+_INTERN: dict[str, str] = {}
+_INTERN_MAX_SIZE = 4096
+
+
+def _intern(value: str) -> str:
+    if (interned := _INTERN.get(value)) is not None:
+        return interned
+    if len(_INTERN) < _INTERN_MAX_SIZE:
+        _INTERN[value] = value
+    return value
+
+
+def _parse_html(text: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    return BeautifulSoup(text, "lxml", parse_only=parse_only)
+
+
+def _get_value(tag: Tag, selector: sv.SoupSieve) -> str | None:
+    selected = selector.select_one(tag)
     if not selected:
         return None
-    return selected.text
+    return selected.get_text(strip=True)
 
 
-@dataclass
+def _get_interned_value(tag: Tag, selector: sv.SoupSieve) -> str | None:
+    if (value := _get_value(tag, selector)) is None:
+        return None
+    return _intern(value)
+
+
+@dataclass(frozen=True, slots=True)
 class LibraryMaterial:
     """Library material container."""
 
@@ -72,7 +150,7 @@ class LibraryMaterial:
     year: str | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LibraryLoan(LibraryMaterial):
     """Library loan container."""
 
@@ -83,24 +161,19 @@ class LibraryLoan(LibraryMaterial):
     @classmethod
     def from_soup(cls, soup: Tag) -> Self:
         """Construct a library loan from a BeautifulSoup tag."""
-        renewable = False
-        if "arena-renewal-false" in soup.get("class"):
-            renewable = False
-        elif "arena-renewal-true" in soup.get("class"):
-            renewable = True
         return cls(
-            record_id=soup.select_one("span.arena-record-id").text,
-            type=_get_value(soup, "div.arena-record-media"),
-            title=soup.select_one("div.arena-record-title span").text,
-            author=_get_value(soup, "div.arena-record-author"),
-            year=_get_value(soup, "div.arena-record-year"),
-            loan_date=_get_value(soup, "div.arena-renewal-branch").rsplit(" ", 1)[-1],
-            expire_date=soup.select_one("span.arena-renewal-date-value").text,
-            renewable=renewable,
+            record_id=_SEL_RECORD_ID.select_one(soup).get_text(strip=True),
+            type=_get_interned_value(soup, _SEL_MEDIA_VALUE),
+            title=_SEL_TITLE.select_one(soup).get_text(strip=True),
+            author=_get_interned_value(soup, _SEL_AUTHOR_VALUE),
+            year=_get_interned_value(soup, _SEL_YEAR_VALUE),
+            loan_date=_get_value(soup, _SEL_RENEWAL_BRANCH_VALUE).rsplit(" ", 1)[-1],
+            expire_date=_SEL_RENEWAL_DATE.select_one(soup).get_text(strip=True),
+            renewable="arena-renewal-true" in soup.get("class", ()),
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LibraryReservation(LibraryMaterial):
     """Library reservation container."""
 
@@ -113,19 +186,19 @@ class LibraryReservation(LibraryMaterial):
     def from_soup(cls, soup: Tag) -> Self:
         """Construct a library reservation from a BeautifulSoup tag."""
         return cls(
-            record_id=soup.select_one("span.arena-record-id").text,
-            type=_get_value(soup, "div.arena-record-media"),
-            title=soup.select_one("div.arena-record-title span").text,
-            author=_get_value(soup, "div.arena-record-author"),
-            year=_get_value(soup, "div.arena-record-year"),
-            created_date=_get_value(soup, "td.arena-reservation-from-container"),
-            expire_date=_get_value(soup, "td.arena-reservation-to-container"),
-            queue_number=_get_value(soup, "td.arena-record-queue").split(" ")[0],
-            pickup_library=_get_value(soup, "td.arena-record-branch"),
+            record_id=_SEL_RECORD_ID.select_one(soup).get_text(strip=True),
+            type=_get_interned_value(soup, _SEL_MEDIA_VALUE),
+            title=_SEL_TITLE.select_one(soup).get_text(strip=True),
+            author=_get_interned_value(soup, _SEL_AUTHOR_VALUE),
+            year=_get_interned_value(soup, _SEL_YEAR_VALUE),
+            created_date=_get_value(soup, _SEL_RESERVATION_FROM_VALUE),
+            expire_date=_get_value(soup, _SEL_RESERVATION_TO_VALUE),
+            queue_number=_get_value(soup, _SEL_QUEUE_VALUE).split(" ")[0],
+            pickup_library=_get_interned_value(soup, _SEL_BRANCH_VALUE),
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LibraryReservationReady(LibraryMaterial):
     """Library reservation ready container."""
 
@@ -138,19 +211,19 @@ class LibraryReservationReady(LibraryMaterial):
     def from_soup(cls, soup: Tag) -> Self:
         """Construct a library reservation from a BeautifulSoup tag."""
         return cls(
-            record_id=soup.select_one("span.arena-record-id").text,
-            type=_get_value(soup, "div.arena-record-media"),
-            title=soup.select_one("div.arena-record-title span").text,
-            author=_get_value(soup, "div.arena-record-author"),
-            year=_get_value(soup, "div.arena-record-year"),
-            created_date=_get_value(soup, "td.arena-reservation-from-container"),
-            pickup_date=_get_value(soup, "td.arena-record-expire"),
-            reservation_number=_get_value(soup, "td.arena-record-pickup"),
-            pickup_library=_get_value(soup, "td.arena-record-branch"),
+            record_id=_SEL_RECORD_ID.select_one(soup).get_text(strip=True),
+            type=_get_interned_value(soup, _SEL_MEDIA_VALUE),
+            title=_SEL_TITLE.select_one(soup).get_text(strip=True),
+            author=_get_interned_value(soup, _SEL_AUTHOR_VALUE),
+            year=_get_interned_value(soup, _SEL_YEAR_VALUE),
+            created_date=_get_value(soup, _SEL_RESERVATION_FROM_VALUE),
+            pickup_date=_get_value(soup, _SEL_EXPIRE_VALUE),
+            reservation_number=_get_value(soup, _SEL_PICKUP_VALUE),
+            pickup_library=_get_interned_value(soup, _SEL_BRANCH_VALUE),
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LibraryDebt(LibraryMaterial):
     """Library debt container."""
 
@@ -168,71 +241,112 @@ class ArenaClient:
         """Initialize the client."""
         self.session = session
         self.base_url = url
+        if not (host := urlparse(url).hostname):
+            raise ArenaInvalidUrlError
+        self._host = host
         self.username = username
         self.password = password
+        self._authenticated = False
+        self._cache_key = (
+            url,
+            username,
+            hashlib.sha256(password.encode()).hexdigest(),
+        )
 
-    async def get_account_overview_html(self) -> BeautifulSoup:
+    async def get_account_overview_html(self) -> str:
         """Get the account overview."""
-        url = f"{self.base_url}/protected/my-account/overview"
-        return await self._get_url(url)
+        if (text := self._get_cached_overview()) is None:
+            url = f"{self.base_url}/protected/my-account/overview"
+            # Only the login portlet is needed to check the login state
+            text, _ = await self._get_url(url, _LOGIN_STRAINER)
+            self._cache_overview(text)
+        return text
 
     async def get_account_overview(self) -> BeautifulSoup:
         """Get the account overview and wrap it in a BeautifulSoup object."""
-        return BeautifulSoup(await self.get_account_overview_html(), "html.parser")
+        if (text := self._get_cached_overview()) is not None:
+            return _parse_html(text)
+        url = f"{self.base_url}/protected/my-account/overview"
+        _, soup = await self._get_url(url)
+        return soup
 
     def get_loans(self, soup: BeautifulSoup) -> list[LibraryLoan]:
         """Get library loans."""
-        table: Tag = soup.select_one("table#loansTable")
+        table: Tag = _SEL_LOANS_TABLE.select_one(soup)
         if not table:
             return []
         _LOGGER.debug("Loans: %s", table)
-        return [
-            LibraryLoan.from_soup(row)
-            for row in table.children
-            if not isinstance(row, NavigableString) and row.name == "tr"
-        ]
-
-    def _get_reservations(self, soup: BeautifulSoup) -> Tag | None:
-        reservations = soup.select_one("div.portlet-myReservations")
-        if not reservations or not reservations.select("div.arena-library-record"):
+        rows = table.find_all("tr", recursive=False)
+        return [LibraryLoan.from_soup(row) for row in rows]
+
+    def get_reservations(
+        self, soup: BeautifulSoup
+    ) -> tuple[list[LibraryReservation], list[LibraryReservationReady]]:
+        """Get active and ready library reservations."""
+        active: list[LibraryReservation] = []
+        ready: list[LibraryReservationReady] = []
+        reservations = _SEL_RESERVATIONS.select_one(soup)
+        if not reservations or not (
+            records := _SEL_RESERVATION_RECORD.select(reservations)
+        ):
             _LOGGER.debug("No reservations")
-            return None
+            return active, ready
         _LOGGER.debug("Reservations: %s", reservations)
-        return reservations
+        for record in records:
+            if _SEL_PICKUP.select_one(record):
+                ready.append(LibraryReservationReady.from_soup(record))
+            else:
+                active.append(LibraryReservation.from_soup(record))
+        return active, ready
 
     def get_active_reservations(self, soup: BeautifulSoup) -> list[LibraryReservation]:
         """Get library reservations."""
-        if not (reservations := self._get_reservations(soup)):
-            return []
-        return [
-            LibraryReservation.from_soup(reservation)
-            for reservation in reservations.select("div.arena-library-record")
-            if not reservation.select_one("td.arena-record-pickup")
-        ]
+        return self.get_reservations(soup)[0]
 
     def get_ready_reservations(
         self, soup: BeautifulSoup
     ) -> list[LibraryReservationReady]:
         """Get library reservations."""
-        if not (reservations := self._get_reservations(soup)):
-            return []
-        return [
-            LibraryReservationReady.from_soup(reservation)
-            for reservation in reservations.select("div.arena-library-record")
-            if reservation.select_one("td.arena-record-pickup")
-        ]
+        return self.get_reservations(soup)[1]
 
-    async def _get_url(self, url: str) -> str:
+    def _get_cached_overview(self) -> str | None:
+        if not (cached := _OVERVIEW_CACHE.get(self._cache_key)):
+            return None
+        timestamp, text = cached
+        if time.monotonic() - timestamp >= OVERVIEW_CACHE_TTL:
+            del _OVERVIEW_CACHE[self._cache_key]
+            return None
+        _LOGGER.debug("Using cached account overview")
+        return text
+
+    def _cache_overview(self, text: str) -> None:
+        now = time.monotonic()
+        for key, (timestamp, _) in list(_OVERVIEW_CACHE.items()):
+            if now - timestamp >= OVERVIEW_CACHE_TTL:
+                del _OVERVIEW_CACHE[key]
+        _OVERVIEW_CACHE[self._cache_key] = (now, text)
+
+    async def _get_url(
+        self, url: str, parse_only: SoupStrainer | None = None
+    ) -> tuple[str, BeautifulSoup]:
+        """Get a page, logging in if needed, and return its HTML and parse tree."""
+        if not self._authenticated:
+            # A new client has no session, don't fetch the login page first
+            return await self._login_and_get_url(url, parse_only)
         try:
             async with self.session.get(url) as resp:
                 resp.raise_for_status()
                 text = await resp.text()
-                self._raise_if_not_logged_in(text)
-                return text
+                soup = _parse_html(text, parse_only)
+                self._raise_if_not_logged_in(soup)
+                return text, soup
         except ArenaNotLoggedInError:
-            return await self._login_and_get_url(url)
+            self._authenticated = False
+            return await self._login_and_get_url(url, parse_only)
 
-    async def _login_and_get_url(self, url: str) -> str:
+    async def _login_and_get_url(
+        self, url: str, parse_only: SoupStrainer | None = None
+    ) -> tuple[str, BeautifulSoup]:
         query_params = {
             "p_p_id": "patronLogin_WAR_arenaportlet",
             "p_p_lifecycle": 1,
@@ -248,7 +362,9 @@ class ArenaClient:
             "openTextUsernameContainer:openTextUsername": self.username,
             "textPassword": self.password,
         }
-        self.session.cookie_jar.clear()
+        # Only drop this library's cookies, the session may be shared. Cookies
+        # the library set on a parent domain are not cleared.
+        self.session.cookie_jar.clear_domain(self._host)
 
         attempt = 0
         while attempt < LOGIN_ATTEMPTS:
@@ -259,15 +375,18 @@ class ArenaClient:
             ) as resp:
                 resp.raise_for_status()
                 text = await resp.text()
+                soup = _parse_html(text, parse_only)
                 try:
-                    self._raise_if_not_logged_in(text)
+                    self._raise_if_not_logged_in(soup)
                 except ArenaNotLoggedInError:
+                    # Only retry when the failure reason is unknown, a locked
+                    # account or invalid credentials are raised immediately
                     continue
-                return text
+                self._authenticated = True
+                return text, soup
         raise ArenaLoginError
 
-    def _raise_if_not_logged_in(self, text: str) -> None:
-        soup = BeautifulSoup(text, "html.parser")
+    def _raise_if_not_logged_in(self, soup: BeautifulSoup) -> None:
         if not (
             patron_login := soup.find(
                 "div", {"id": "portlet_patronLogin_WAR_arenaportlet"}
@@ -282,13 +401,15 @@ class ArenaClient:
                 "span", {"class": "feedbackPanelWARNING"}
             )
         ):
-            _LOGGER.debug("No feedback panel found: %s", text)
-            raise ArenaNotLoggedInError("No feedback panel found: %s", text)  # noqa: TRY003, EM101
-        if feedback_panel.text.startswith("Ditt konto har stängts"):
+            _LOGGER.debug("No feedback panel found: %s", patron_login)
+            raise ArenaNotLoggedInError("No feedback panel found")  # noqa: TRY003, EM101
+        feedback = feedback_panel.get_text(strip=True)
+        match = _FEEDBACK_RE.match(feedback)
+        if match and match.lastgroup == "account_locked":
             _LOGGER.debug("Account locked")
             raise ArenaAccountLockedError
-        if feedback_panel.text.startswith("Du blev inte inloggad"):
+        if match and match.lastgroup == "invalid_credentials":
             _LOGGER.debug("Invalid credentials")
             raise ArenaInvalidCredentialsError
-        _LOGGER.debug("Unknown error while logging in: %s", feedback_panel.text)
-        raise ArenaNotLoggedInError(feedback_panel.text)
+        _LOGGER.debug("Unknown error while logging in: %s", feedback)
+        raise ArenaNotLoggedInError(feedback)
@@ -61,7 +61,7 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
             password=data[CONF_PASSWORD],
         )
 
-        await client.get_account_overview()
+        await client.get_account_overview_html()
     except ArenaError:
         return {"base": "cannot_connect"}
     except ArenaAccountLockedError:
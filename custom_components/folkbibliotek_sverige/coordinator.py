@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import timedelta
+import logging
 from typing import TYPE_CHECKING
 
 from homeassistant.exceptions import ConfigEntryAuthFailed
@@ -30,10 +31,10 @@ if TYPE_CHECKING:
 class FolkbibliotekSverigeData:
     """Analytics data class."""
 
-    loans: list[LibraryLoan]
-    active_reservations: list[LibraryReservation]
-    waiting_reservations: list[
-        LibraryReservationReady
+    loans: tuple[LibraryLoan, ...]
+    active_reservations: tuple[LibraryReservation, ...]
+    waiting_reservations: tuple[
+        LibraryReservationReady, ...
     ]  # Rename to LibraryWaitingReservation
 
 
@@ -75,15 +76,16 @@ class FolkbibliotekSverigeDataUpdateCoordinator(
             raise ConfigEntryAuthFailed(err) from err
         except ArenaError as err:
             raise UpdateFailed("Error communicating with the library database") from err  # noqa: EM101, TRY003
-        LOGGER.debug("loans: %s", self._client.get_loans(overview))
-        LOGGER.debug(
-            "active reservations: %s", self._client.get_active_reservations(overview)
-        )
-        LOGGER.debug(
-            "ready reservations: %s", self._client.get_ready_reservations(overview)
+        loans = self._client.get_loans(overview)
+        active_reservations, ready_reservations = self._client.get_reservations(
+            overview
         )
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("loans: %s", loans)
+            LOGGER.debug("active reservations: %s", active_reservations)
+            LOGGER.debug("ready reservations: %s", ready_reservations)
         return FolkbibliotekSverigeData(
-            loans=self._client.get_loans(overview),
-            active_reservations=self._client.get_active_reservations(overview),
-            waiting_reservations=self._client.get_ready_reservations(overview),
+            loans=tuple(loans),
+            active_reservations=tuple(active_reservations),
+            waiting_reservations=tuple(ready_reservations),
         )
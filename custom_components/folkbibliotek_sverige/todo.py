@@ -4,7 +4,9 @@ from __future__ import annotations
 
 from abc import abstractmethod
 import datetime
-from typing import TYPE_CHECKING
+from functools import lru_cache
+import logging
+from typing import TYPE_CHECKING, Any, Final
 
 from homeassistant.components.todo import TodoItem, TodoItemStatus, TodoListEntity
 from homeassistant.core import HomeAssistant, callback
@@ -18,6 +20,15 @@ if TYPE_CHECKING:
     from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
     from . import FolkbibliotekSverigeConfigEntry
+    from .axiell_arena_client import (
+        LibraryLoan,
+        LibraryReservation,
+        LibraryReservationReady,
+    )
+    from .coordinator import FolkbibliotekSverigeData
+
+_DESCR_RENEWABLE: Final = "Can be renewed"
+_DESCR_NOT_RENEWABLE: Final = "Can not be renewed"
 
 
 async def async_setup_entry(
@@ -37,6 +48,72 @@ async def async_setup_entry(
     )
 
 
+@lru_cache(maxsize=256)
+def _parse_date(value: str) -> datetime.date:
+    """Parse an ISO date, the same few dates repeat across updates."""
+    return datetime.date.fromisoformat(value)
+
+
+# Loans and reservations are frozen and compared by value, an unchanged record
+# maps to the same todo item as in the previous update
+@lru_cache(maxsize=256)
+def _loan_todo_item(loan: LibraryLoan) -> TodoItem:
+    """Build the todo item for a checked out item."""
+    return TodoItem(
+        summary=loan.title,
+        uid=loan.record_id,
+        status=TodoItemStatus.NEEDS_ACTION,
+        due=_parse_date(loan.expire_date),
+        description=_DESCR_RENEWABLE
+        if loan.renewable
+        else _DESCR_NOT_RENEWABLE,  # Should we include more details?
+    )
+
+
+@lru_cache(maxsize=256)
+def _active_hold_todo_item(reservation: LibraryReservation) -> TodoItem:
+    """Build the todo item for a hold waiting in queue."""
+    return TodoItem(
+        summary=reservation.title,
+        uid=reservation.record_id,
+        status=None,
+        description=f"Queue number {reservation.queue_number}",
+    )
+
+
+@lru_cache(maxsize=256)
+def _ready_hold_todo_item(reservation: LibraryReservationReady) -> TodoItem:
+    """Build the todo item for a hold ready for pickup."""
+    return TodoItem(
+        summary=reservation.title,
+        uid=reservation.record_id,
+        status=TodoItemStatus.NEEDS_ACTION,
+        due=_parse_date(reservation.pickup_date),
+        description=f"Ready for pickup at {reservation.pickup_library}",
+    )
+
+
+# Both entities of a config entry are updated one after the other with the same
+# coordinator data, the cache lets the second entity reuse the first one's build
+@lru_cache(maxsize=4)
+def _build_todo_lists(
+    data: FolkbibliotekSverigeData,
+) -> tuple[list[TodoItem], list[TodoItem]]:
+    """Build the checked out and holds todo items from coordinator data."""
+    checked_out = [_loan_todo_item(loan) for loan in data.loans]
+    holds = [
+        *(
+            _active_hold_todo_item(reservation)
+            for reservation in data.active_reservations
+        ),
+        *(
+            _ready_hold_todo_item(reservation)
+            for reservation in data.waiting_reservations
+        ),
+    ]
+    return checked_out, holds
+
+
 class FolkbibliotekSverigeTodoListEntity(
     CoordinatorEntity[FolkbibliotekSverigeDataUpdateCoordinator], TodoListEntity
 ):
@@ -52,6 +129,7 @@ class FolkbibliotekSverigeTodoListEntity(
     ) -> None:
         """Initialize TodoistTodoListEntity."""
         super().__init__(coordinator=coordinator)
+        self._last_source: Any = None
         self._attr_unique_id = f"{config_entry_id}-{self._attr_translation_key}"
         self._attr_device_info = DeviceInfo(
             entry_type=DeviceEntryType.SERVICE,
@@ -62,14 +140,27 @@ class FolkbibliotekSverigeTodoListEntity(
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        LOGGER.debug("Data: %s", self.coordinator.data)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Data: %s", self.coordinator.data)
         if self.coordinator.data is None:
             self._attr_todo_items = None
+            self._last_source = None
         else:
+            # Skip rebuilding the items and writing the state if neither the
+            # entity's data nor the coordinator's availability changed
+            source = (self._get_source(), self.coordinator.last_update_success)
+            if source == self._last_source and self._attr_todo_items is not None:
+                return
+            self._last_source = source
             self._attr_todo_items = self._get_todo_items()
-        LOGGER.debug("TODO-items: %s", self._attr_todo_items)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("TODO-items: %s", self._attr_todo_items)
         super()._handle_coordinator_update()
 
+    @abstractmethod
+    def _get_source(self) -> Any:
+        """Get the coordinator data the todo items are built from."""
+
     @abstractmethod
     def _get_todo_items(self) -> list[TodoItem]:
         """Get the todo items for this entity."""
@@ -99,20 +190,13 @@ class FolkbibliotekSverigeCheckedOut(FolkbibliotekSverigeTodoListEntity):
             config_entry_name=config_entry_name,
         )
 
+    def _get_source(self) -> Any:
+        """Get the coordinator data the todo items are built from."""
+        return self.coordinator.data.loans
+
     def _get_todo_items(self) -> list[TodoItem]:
         """Get the todo items for this entity."""
-        return [
-            TodoItem(
-                summary=loan.title,
-                uid=f"{loan.record_id}",
-                status=TodoItemStatus.NEEDS_ACTION,
-                due=datetime.date.fromisoformat(loan.expire_date),
-                description="Can be renewed"
-                if loan.renewable
-                else "Can not be renewed",  # Should we include more details?
-            )
-            for loan in self.coordinator.data.loans
-        ]
+        return _build_todo_lists(self.coordinator.data)[0]
 
 
 class FolkbibliotekSverigeHolds(FolkbibliotekSverigeTodoListEntity):
@@ -133,25 +217,13 @@ class FolkbibliotekSverigeHolds(FolkbibliotekSverigeTodoListEntity):
             config_entry_name=config_entry_name,
         )
 
+    def _get_source(self) -> Any:
+        """Get the coordinator data the todo items are built from."""
+        return (
+            self.coordinator.data.active_reservations,
+            self.coordinator.data.waiting_reservations,
+        )
+
     def _get_todo_items(self) -> list[TodoItem]:
         """Get the todo items for this entity."""
-        items = [
-            TodoItem(
-                summary=reservation.title,
-                uid=f"{reservation.record_id}",
-                status=None,
-                description=f"Queue number {reservation.queue_number}",
-            )
-            for reservation in self.coordinator.data.active_reservations
-        ]
-        items.extend(
-            TodoItem(
-                summary=reservation.title,
-                uid=f"{reservation.record_id}",
-                status=TodoItemStatus.NEEDS_ACTION,
-                due=datetime.date.fromisoformat(reservation.pickup_date),
-                description=f"Ready for pickup at {reservation.pickup_library}",
-            )
-            for reservation in self.coordinator.data.waiting_reservations
-        )
-        return items
+        return _build_todo_lists(self.coordinator.data)[1]
@@ -1,13 +1,20 @@
 """Tests for the Folkbibliotek Sverige custom integration."""
 
+from functools import cache
 from pathlib import Path
+import re
 
 BASE_URL = "https://folkbiblioteken.lund.se"
 USERNAME = "username"
 PASSWORD = "password"
 
+OVERVIEW_URL = f"{BASE_URL}/protected/my-account/overview"
+LOGIN_POST_RE = re.compile(rf"^{re.escape(OVERVIEW_URL)}\?_patronLogin_WAR.*")
 
+_FIXTURES = Path(__package__) / "fixtures"
+
+
+@cache
 def load_fixture(filename: str) -> str:
     """Load a fixture."""
-    path = Path(__package__) / "fixtures" / filename
-    return path.read_text(encoding="utf-8")
+    return (_FIXTURES / filename).read_text(encoding="utf-8")
@@ -2,6 +2,7 @@
 
 from collections.abc import Generator
 import logging
+from typing import Final
 from unittest.mock import AsyncMock, patch
 
 from aioresponses import aioresponses
@@ -9,6 +10,7 @@ from homeassistant.const import CONF_NAME, CONF_PASSWORD, CONF_URL, CONF_USERNAM
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.folkbibliotek_sverige.axiell_arena_client import _OVERVIEW_CACHE
 from custom_components.folkbibliotek_sverige.const import DOMAIN
 
 from . import BASE_URL, PASSWORD, USERNAME
@@ -17,6 +19,13 @@ _LOGGER = logging.getLogger(__name__)
 
 logging.basicConfig(level=logging.DEBUG)
 
+_CONFIG_DATA: Final[dict[str, str]] = {
+    CONF_NAME: "John Doe",
+    CONF_PASSWORD: PASSWORD,
+    CONF_URL: BASE_URL,
+    CONF_USERNAME: USERNAME,
+}
+
 
 @pytest.fixture
 def mock_setup_entry() -> Generator[AsyncMock]:
@@ -28,6 +37,13 @@ def mock_setup_entry() -> Generator[AsyncMock]:
         yield mock_setup_entry
 
 
+@pytest.fixture(autouse=True)
+def clear_overview_cache() -> Generator[None]:
+    """Clear the account overview cache after each test."""
+    yield
+    _OVERVIEW_CACHE.clear()
+
+
 @pytest.fixture(name="responses")
 def aioresponses_fixture() -> Generator[aioresponses]:
     """Return aioresponses fixture."""
@@ -41,11 +57,6 @@ def mock_config_entry() -> MockConfigEntry:
     return MockConfigEntry(
         domain=DOMAIN,
         title="John Doe",
-        data={
-            CONF_NAME: "John Doe",
-            CONF_PASSWORD: PASSWORD,
-            CONF_URL: BASE_URL,
-            CONF_USERNAME: USERNAME,
-        },
+        data=dict(_CONFIG_DATA),
         unique_id="user@host.com",
     )
@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-import re
+from collections import Counter
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
 import aiohttp
@@ -10,34 +11,39 @@ from aioresponses import aioresponses
 import pytest
 
 from custom_components.folkbibliotek_sverige.axiell_arena_client import (
+    _OVERVIEW_CACHE,
+    OVERVIEW_CACHE_TTL,
     ArenaAccountLockedError,
     ArenaClient,
     ArenaInvalidCredentialsError,
+    ArenaInvalidUrlError,
     ArenaLoginError,
 )
 
-from . import load_fixture
+from . import BASE_URL, LOGIN_POST_RE, OVERVIEW_URL, PASSWORD, USERNAME, load_fixture
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator, Generator
 
+    from freezegun.api import FrozenDateTimeFactory
     from syrupy import SnapshotAssertion
 
-BASE_URL = "https://folkbiblioteken.lund.se"
-USERNAME = "username"
-PASSWORD = "password"
+OTHER_PASSWORD = "other_password"
 
 
 @pytest.fixture
-async def client() -> AsyncGenerator[ArenaClient]:
+async def session() -> AsyncGenerator[aiohttp.ClientSession]:
+    """Return an aiohttp client session."""
+    async with aiohttp.ClientSession() as session_:
+        yield session_
+
+
+@pytest.fixture
+def client(session: aiohttp.ClientSession) -> ArenaClient:
     """Return an Axiell Arena client."""
-    async with (
-        aiohttp.ClientSession() as session,
-    ):
-        client_ = ArenaClient(
-            session=session, url=BASE_URL, username=USERNAME, password=PASSWORD
-        )
-        yield client_
+    return ArenaClient(
+        session=session, url=BASE_URL, username=USERNAME, password=PASSWORD
+    )
 
 
 @pytest.fixture(name="responses")
@@ -47,14 +53,22 @@ def aioresponses_fixture() -> Generator[aioresponses]:
         yield mocked_responses
 
 
+def _request_counts(responses: aioresponses) -> Counter[str]:
+    """Return the number of requests made per HTTP method."""
+    counts: Counter[str] = Counter()
+    for (method, _), calls in responses.requests.items():
+        counts[method] += len(calls)
+    return counts
+
+
 async def test_success(
     responses: aioresponses,
     client: ArenaClient,
     snapshot: SnapshotAssertion,
 ) -> None:
     """Test successful retrieval of account overview."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("logged_in.html"),
     )
 
@@ -70,8 +84,8 @@ async def test_success_no_loans(
     snapshot: SnapshotAssertion,
 ) -> None:
     """Test successful retrieval of account overview with no checked out media."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("logged_in_no_loans.html"),
     )
 
@@ -87,8 +101,8 @@ async def test_success_no_reservations(
     snapshot: SnapshotAssertion,
 ) -> None:
     """Test successful retrieval of account overview with no holds."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("logged_in_no_reservations.html"),
     )
 
@@ -104,8 +118,8 @@ async def test_success_reservation_to_pick_up(
     snapshot: SnapshotAssertion,
 ) -> None:
     """Test successful retrieval of account overview with hold to pick up."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("logged_in_reservation_to_pick_up.html"),
     )
 
@@ -115,41 +129,126 @@ async def test_success_reservation_to_pick_up(
     assert client.get_ready_reservations(overview) == snapshot
 
 
+async def test_success_reservations_queued_and_to_pick_up(
+    responses: aioresponses,
+    client: ArenaClient,
+    snapshot: SnapshotAssertion,
+) -> None:
+    """Test successful retrieval of account overview with queued and ready holds."""
+    responses.post(
+        LOGIN_POST_RE,
+        body=load_fixture("logged_in_reservations_queued_and_to_pick_up.html"),
+    )
+
+    overview = await client.get_account_overview()
+    active_reservations, ready_reservations = client.get_reservations(overview)
+    assert active_reservations == snapshot
+    assert ready_reservations == snapshot
+
+
 async def test_success_need_login(
     responses: aioresponses,
     client: ArenaClient,
+    freezer: FrozenDateTimeFactory,
     snapshot: SnapshotAssertion,
 ) -> None:
-    """Test log in."""
+    """Test log in again when the session has expired."""
     responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+        OVERVIEW_URL,
         body=load_fixture("not_logged_in.html"),
     )
-    escaped_url = re.escape(f"{BASE_URL}/protected/my-account/overview")
     responses.post(
-        re.compile(rf"^{escaped_url}\?_patronLogin_WAR.*"),
+        LOGIN_POST_RE,
         body=load_fixture("logged_in.html"),
         repeat=True,
     )
 
+    await client.get_account_overview()
+    freezer.tick(timedelta(seconds=OVERVIEW_CACHE_TTL))
     overview = await client.get_account_overview()
     assert client.get_loans(overview) == snapshot
     assert client.get_active_reservations(overview) == []
     assert client.get_ready_reservations(overview) == []
+    assert _request_counts(responses) == {"GET": 1, "POST": 2}
 
 
-async def test_no_login(
+async def test_success_logged_in(
     responses: aioresponses,
     client: ArenaClient,
+    freezer: FrozenDateTimeFactory,
 ) -> None:
-    """Test no log in."""
+    """Test the session is reused once logged in."""
     responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
-        body=load_fixture("not_logged_in.html"),
+        OVERVIEW_URL,
+        body=load_fixture("logged_in.html"),
     )
-    escaped_url = re.escape(f"{BASE_URL}/protected/my-account/overview")
     responses.post(
-        re.compile(rf"^{escaped_url}\?_patronLogin_WAR.*"),
+        LOGIN_POST_RE,
+        body=load_fixture("logged_in.html"),
+    )
+
+    first_overview = await client.get_account_overview()
+    freezer.tick(timedelta(seconds=OVERVIEW_CACHE_TTL))
+    overview = await client.get_account_overview()
+    assert client.get_loans(overview) == client.get_loans(first_overview)
+    assert _request_counts(responses) == {"GET": 1, "POST": 1}
+
+
+async def test_overview_cached(
+    responses: aioresponses,
+    client: ArenaClient,
+) -> None:
+    """Test a validated account overview is reused with the same credentials."""
+    responses.post(
+        LOGIN_POST_RE,
+        body=load_fixture("logged_in.html"),
+        repeat=True,
+    )
+
+    await client.get_account_overview_html()
+    other_client = ArenaClient(
+        session=client.session, url=BASE_URL, username=USERNAME, password=PASSWORD
+    )
+    overview = await other_client.get_account_overview()
+    assert other_client.get_loans(overview)
+    assert _request_counts(responses) == {"POST": 1}
+
+    other_client = ArenaClient(
+        session=client.session, url=BASE_URL, username=USERNAME, password=OTHER_PASSWORD
+    )
+    await other_client.get_account_overview()
+    assert _request_counts(responses) == {"POST": 2}
+    # Only validated account overviews are cached
+    assert len(_OVERVIEW_CACHE) == 1
+
+
+async def test_overview_cache_expired(
+    responses: aioresponses,
+    client: ArenaClient,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test an expired account overview is dropped when it is read."""
+    responses.post(
+        LOGIN_POST_RE,
+        body=load_fixture("logged_in.html"),
+    )
+    responses.get(OVERVIEW_URL, status=500)
+
+    await client.get_account_overview_html()
+    assert _OVERVIEW_CACHE
+    freezer.tick(timedelta(seconds=OVERVIEW_CACHE_TTL))
+    with pytest.raises(aiohttp.ClientResponseError):
+        await client.get_account_overview()
+    assert not _OVERVIEW_CACHE
+
+
+async def test_no_login(
+    responses: aioresponses,
+    client: ArenaClient,
+) -> None:
+    """Test no log in."""
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("not_logged_in.html"),
         repeat=True,
     )
@@ -163,18 +262,15 @@ async def test_account_locked(
     client: ArenaClient,
 ) -> None:
     """Test account is locked."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
-        body=load_fixture("not_logged_in.html"),
-    )
-    escaped_url = re.escape(f"{BASE_URL}/protected/my-account/overview")
     responses.post(
-        re.compile(rf"^{escaped_url}\?_patronLogin_WAR.*"),
+        LOGIN_POST_RE,
         body=load_fixture("login_failed_too_many_attempts.html"),
+        repeat=True,
     )
 
     with pytest.raises(ArenaAccountLockedError):
         await client.get_account_overview()
+    assert _request_counts(responses) == {"POST": 1}
 
 
 async def test_wrong_credentials(
@@ -182,15 +278,23 @@ async def test_wrong_credentials(
     client: ArenaClient,
 ) -> None:
     """Test account wrong password."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
-        body=load_fixture("not_logged_in.html"),
-    )
-    escaped_url = re.escape(f"{BASE_URL}/protected/my-account/overview")
     responses.post(
-        re.compile(rf"^{escaped_url}\?_patronLogin_WAR.*"),
+        LOGIN_POST_RE,
         body=load_fixture("login_failed_wrong_credentials.html"),
+        repeat=True,
     )
 
     with pytest.raises(ArenaInvalidCredentialsError):
         await client.get_account_overview()
+    assert _request_counts(responses) == {"POST": 1}
+
+
+async def test_invalid_url(session: aiohttp.ClientSession) -> None:
+    """Test a URL without a host name is rejected."""
+    with pytest.raises(ArenaInvalidUrlError):
+        ArenaClient(
+            session=session,
+            url="folkbiblioteken.lund.se",
+            username=USERNAME,
+            password=PASSWORD,
+        )
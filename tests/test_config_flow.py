@@ -9,10 +9,20 @@ from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
+import voluptuous as vol
 
 from custom_components.folkbibliotek_sverige.const import DOMAIN
 
-from . import BASE_URL, PASSWORD, USERNAME, load_fixture
+from . import BASE_URL, LOGIN_POST_RE, PASSWORD, USERNAME, load_fixture
+
+
+def _suggested_values(schema: vol.Schema) -> dict[str, str]:
+    """Return the suggested values of a form's data schema."""
+    return {
+        str(key): key.description["suggested_value"]
+        for key in schema.schema
+        if key.description and "suggested_value" in key.description
+    }
 
 
 @pytest.mark.usefixtures("enable_custom_integrations")
@@ -22,8 +32,8 @@ async def test_user_flow(
     responses: aioresponses,
 ) -> None:
     """Test that the user flow works."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("logged_in.html"),
     )
 
@@ -63,8 +73,8 @@ async def test_reauth_flow(
     responses: aioresponses,
 ) -> None:
     """Test that the reauth flow works."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("logged_in.html"),
     )
 
@@ -75,6 +85,10 @@ async def test_reauth_flow(
     assert result["type"] is FlowResultType.FORM
     assert result["step_id"] == "reauth_confirm"
     assert not result["errors"]
+    assert _suggested_values(result["data_schema"]) == {
+        CONF_URL: BASE_URL,
+        CONF_USERNAME: USERNAME,
+    }
 
     result = await hass.config_entries.flow.async_configure(
         result["flow_id"],
@@ -98,8 +112,8 @@ async def test_reconfigure_flow(
     responses: aioresponses,
 ) -> None:
     """Test that the reconfigure flow works."""
-    responses.get(
-        f"{BASE_URL}/protected/my-account/overview",
+    responses.post(
+        LOGIN_POST_RE,
         body=load_fixture("logged_in.html"),
     )
 
@@ -110,6 +124,10 @@ async def test_reconfigure_flow(
     assert result["type"] is FlowResultType.FORM
     assert result["step_id"] == "reconfigure"
     assert not result["errors"]
+    assert _suggested_values(result["data_schema"]) == {
+        CONF_URL: BASE_URL,
+        CONF_USERNAME: USERNAME,
+    }
 
     result = await hass.config_entries.flow.async_configure(
         result["flow_id"],
@@ -0,0 +1,146 @@
+"""Tests for the Folkbibliotek Sverige todo platform."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.components.todo import DOMAIN as TODO_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, STATE_UNAVAILABLE
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from . import LOGIN_POST_RE, OVERVIEW_URL, load_fixture
+
+if TYPE_CHECKING:
+    from aioresponses import aioresponses
+    from freezegun.api import FrozenDateTimeFactory
+    from homeassistant.core import HomeAssistant
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+    from syrupy import SnapshotAssertion
+
+CHECKED_OUT = "todo.john_doe_checked_out"
+HOLDS = "todo.john_doe_holds"
+
+_UPDATE_INTERVAL = timedelta(hours=2)
+
+
+async def _setup_entry(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    responses: aioresponses,
+    fixture: str,
+) -> None:
+    """Set up the config entry with the given account overview."""
+    responses.post(LOGIN_POST_RE, body=load_fixture(fixture))
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def _update(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    responses: aioresponses,
+    fixture: str | None,
+) -> None:
+    """Let the coordinator update, with the given account overview or an error."""
+    if fixture is None:
+        responses.get(OVERVIEW_URL, status=500)
+    else:
+        responses.get(OVERVIEW_URL, body=load_fixture(fixture))
+    freezer.tick(_UPDATE_INTERVAL)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def _get_items(hass: HomeAssistant, entity_id: str) -> list[dict[str, str]]:
+    """Return the items of a todo list."""
+    response = await hass.services.async_call(
+        TODO_DOMAIN,
+        "get_items",
+        {ATTR_ENTITY_ID: entity_id},
+        blocking=True,
+        return_response=True,
+    )
+    return response[entity_id]["items"]
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_todo_items(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    responses: aioresponses,
+    snapshot: SnapshotAssertion,
+) -> None:
+    """Test the todo items."""
+    await _setup_entry(
+        hass, mock_config_entry, responses, "logged_in_reservation_to_pick_up.html"
+    )
+
+    assert hass.states.get(CHECKED_OUT).state == "3"
+    assert hass.states.get(HOLDS).state == "1"
+    assert await _get_items(hass, CHECKED_OUT) == snapshot
+    assert await _get_items(hass, HOLDS) == snapshot
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_unchanged_update(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    responses: aioresponses,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test the state is not written again when nothing changed."""
+    await _setup_entry(hass, mock_config_entry, responses, "logged_in.html")
+    last_reported = hass.states.get(CHECKED_OUT).last_reported
+
+    await _update(hass, freezer, responses, "logged_in.html")
+
+    assert hass.states.get(CHECKED_OUT).last_reported == last_reported
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_failed_update(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    responses: aioresponses,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test the entities are unavailable while updates fail."""
+    await _setup_entry(hass, mock_config_entry, responses, "logged_in.html")
+    checked_out = hass.states.get(CHECKED_OUT).state
+    holds = hass.states.get(HOLDS).state
+
+    await _update(hass, freezer, responses, None)
+
+    assert hass.states.get(CHECKED_OUT).state == STATE_UNAVAILABLE
+    assert hass.states.get(HOLDS).state == STATE_UNAVAILABLE
+
+    # The same data as before the failure makes the entities available again
+    await _update(hass, freezer, responses, "logged_in.html")
+
+    assert hass.states.get(CHECKED_OUT).state == checked_out
+    assert hass.states.get(HOLDS).state == holds
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_changed_update(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    responses: aioresponses,
+    freezer: FrozenDateTimeFactory,
+    snapshot: SnapshotAssertion,
+) -> None:
+    """Test the todo items are updated when loans and holds change."""
+    await _setup_entry(hass, mock_config_entry, responses, "logged_in_no_loans.html")
+    assert hass.states.get(CHECKED_OUT).state == "0"
+    holds = await _get_items(hass, HOLDS)
+    assert holds
+
+    await _update(hass, freezer, responses, "logged_in_reservation_to_pick_up.html")
+
+    assert hass.states.get(CHECKED_OUT).state == "3"
+    assert hass.states.get(HOLDS).state == "1"
+    assert await _get_items(hass, CHECKED_OUT) == snapshot
+    assert await _get_items(hass, HOLDS) != holds